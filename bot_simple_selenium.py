@@ -2,8 +2,8 @@ import os
 import logging
 from telegram.ext import Application, CommandHandler, ContextTypes
 from telegram import Update
-from bs4 import BeautifulSoup
-import requests
+from telegram.error import Forbidden, RetryAfter
+import httpx
 import asyncio
 import datetime
 import hashlib
@@ -11,6 +11,12 @@ import time
 import traceback
 from urllib.parse import urljoin, urlparse
 import json
+import re
+import socket
+import threading
+import weakref
+
+from relevance_keywords import is_relevant_news
 
 # Setup logging yang lebih detail
 logging.basicConfig(
@@ -25,6 +31,13 @@ BOT_TOKEN = os.getenv('BOT_TOKEN')
 CHANNEL_ID = os.getenv('CHANNEL_ID')
 CHECK_INTERVAL = int(os.getenv('CHECK_INTERVAL', '300'))
 DEBUG_MODE = os.getenv('DEBUG_MODE', 'False').lower() == 'true'
+HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '10'))
+HTTP_KEEPALIVE = int(os.getenv('HTTP_KEEPALIVE', '600'))
+DNS_CACHE_TTL = int(os.getenv('DNS_CACHE_TTL', '0'))  # Opt-in, 0 = tanpa cache DNS
+SEND_RATE_LIMIT = float(os.getenv('SEND_RATE_LIMIT', '25'))  # Pesan per detik untuk seluruh bot (limit Telegram ~30/s)
+DM_CONCURRENCY = int(os.getenv('DM_CONCURRENCY', '10'))
+MAX_SUBSCRIPTIONS = int(os.getenv('MAX_SUBSCRIPTIONS', '50'))
+ADMIN_IDS = {int(user_id) for user_id in os.getenv('ADMIN_IDS', '').split(',') if user_id.strip()}
 
 # Validasi environment variables
 if not BOT_TOKEN:
@@ -42,38 +55,91 @@ logger.info(f"   BOT_TOKEN: {BOT_TOKEN[:10]}...")
 logger.info(f"   CHANNEL_ID: {CHANNEL_ID}")
 logger.info(f"   CHECK_INTERVAL: {CHECK_INTERVAL}")
 logger.info(f"   DEBUG_MODE: {DEBUG_MODE}")
+logger.info(f"   HTTP_POOL_SIZE: {HTTP_POOL_SIZE}")
+logger.info(f"   DNS_CACHE_TTL: {DNS_CACHE_TTL}")
 
 # Penyimpanan dalam memory dengan backup file
-SENT_NEWS_FILE = "sent_news.txt"
-SAMPLE_NEWS_FILE = "sample_news.json"
-sent_news_titles = set()
+STATE_SNAPSHOT_FILE = "state_snapshot.json"
+SENT_NEWS_FILE = "sent_news.txt"  # Format lama, hanya dibaca untuk migrasi
+SAMPLE_NEWS_FILE = "sample_news.json"  # Format lama, hanya dibaca untuk migrasi
+HEADLINE_ARCHIVE_FILE = "headline_archive.jsonl"
+HEADLINE_LABELS_FILE = "headline_labels.jsonl"  # Label manual dari admin via /label
+RELEVANCE_MODEL_FILE = "relevance_model.npz"
+SUBSCRIPTIONS_FILE = "subscriptions.json"
+RELEVANCE_THRESHOLD = os.getenv('RELEVANCE_THRESHOLD')
+sent_news_titles = {}  # Hash judul -> None (dict supaya urutan kirim terjaga)
 sample_news_items = []  # Untuk menyimpan sample berita
+archived_titles = None  # Hash judul yang sudah masuk arsip training
+relevance_model = None
+relevance_model_loaded = False
+page_fingerprints = {}  # Nama sumber -> validator HTTP dan hash konten halaman
+scheduler_state = {'last_cycle_at': None, 'cycle_count': 0}
+prefetch_task = None  # Scrape pertama yang dimulai bersamaan dengan setup polling
+scrape_lock = asyncio.Lock()  # Satu scrape dalam satu waktu (job terjadwal dan /test)
+user_subscriptions = {}  # user_id -> set(term)
+subscription_index = {}  # Inverted index: term -> set(user_id)
+max_term_words = 1
+send_next_slot = 0.0  # Waktu loop paling awal untuk pengiriman berikutnya (channel + DM)
+
+def load_state_snapshot():
+    """Load seluruh state runtime dari satu file snapshot (fallback ke file lama)"""
+    global sent_news_titles, sample_news_items
+    try:
+        if not os.path.exists(STATE_SNAPSHOT_FILE):
+            logger.info("📁 No state snapshot found, migrating legacy files")
+            load_sent_news()
+            load_sample_news()
+            return
+        
+        with open(STATE_SNAPSHOT_FILE, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        
+        sent_news_titles = dict.fromkeys(state.get('sent_news', []))
+        sample_news_items = state.get('sample_news', [])
+        page_fingerprints.update(state.get('page_fingerprints', {}))
+        scheduler_state.update(state.get('scheduler', {}))
+        logger.info(f"📁 Restored snapshot: {len(sent_news_titles)} sent news, "
+                    f"{len(sample_news_items)} samples, {len(page_fingerprints)} page fingerprints "
+                    f"(saved {state.get('saved_at', 'unknown')})")
+    except Exception as e:
+        logger.error(f"❌ Failed to load state snapshot: {e}")
+        load_sent_news()
+        load_sample_news()
+
+def save_state_snapshot():
+    """Simpan seluruh state runtime secara atomik ke satu file snapshot (hanya dari event loop)"""
+    try:
+        state = {
+            'sent_news': list(sent_news_titles),
+            'sample_news': sample_news_items[-50:],  # Simpan 50 terakhir
+            'page_fingerprints': dict(page_fingerprints),
+            'scheduler': dict(scheduler_state),
+            'saved_at': datetime.datetime.now().isoformat()
+        }
+        temp_file = STATE_SNAPSHOT_FILE + '.tmp'
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(temp_file, STATE_SNAPSHOT_FILE)
+        if DEBUG_MODE:
+            logger.debug(f"💾 Saved snapshot ({len(sent_news_titles)} sent news)")
+    except Exception as e:
+        logger.error(f"❌ Failed to save state snapshot: {e}")
 
 def load_sent_news():
-    """Load sent news from file"""
+    """Load sent news from legacy file"""
     global sent_news_titles
     try:
         if os.path.exists(SENT_NEWS_FILE):
             with open(SENT_NEWS_FILE, 'r', encoding='utf-8') as f:
-                sent_news_titles = set(line.strip() for line in f if line.strip())
+                sent_news_titles = dict.fromkeys(line.strip() for line in f if line.strip())
             logger.info(f"📁 Loaded {len(sent_news_titles)} sent news from file")
         else:
             logger.info("📁 No sent news file found, starting fresh")
     except Exception as e:
         logger.error(f"❌ Failed to load sent news: {e}")
 
-def save_sent_news():
-    """Save sent news to file"""
-    try:
-        with open(SENT_NEWS_FILE, 'w', encoding='utf-8') as f:
-            for title_hash in sent_news_titles:
-                f.write(title_hash + '\n')
-        logger.info(f"💾 Saved {len(sent_news_titles)} news to file")
-    except Exception as e:
-        logger.error(f"❌ Failed to save sent news: {e}")
-
 def load_sample_news():
-    """Load sample news from file"""
+    """Load sample news from legacy file"""
     global sample_news_items
     try:
         if os.path.exists(SAMPLE_NEWS_FILE):
@@ -87,15 +153,6 @@ def load_sample_news():
         logger.error(f"❌ Failed to load sample news: {e}")
         sample_news_items = []
 
-def save_sample_news():
-    """Save sample news to file"""
-    try:
-        with open(SAMPLE_NEWS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(sample_news_items[-50:], f, indent=2, ensure_ascii=False)  # Simpan 50 terakhir
-        logger.info(f"💾 Saved {len(sample_news_items)} sample news to file")
-    except Exception as e:
-        logger.error(f"❌ Failed to save sample news: {e}")
-
 def add_sample_news(news_items):
     """Add new sample news items"""
     global sample_news_items
@@ -114,7 +171,137 @@ def add_sample_news(news_items):
     if len(sample_news_items) > 100:
         sample_news_items = sample_news_items[-100:]
     
-    save_sample_news()
+    save_state_snapshot()
+
+# Transport HTTP bersama (connection pool + keep-alive + HTTP/2 + DNS cache opsional)
+http_client = None
+http_stats = {}  # Statistik per host: requests, new_connections, reused, bytes, latency
+_http_streams = {}  # Network stream yang sudah pernah dipakai per host (WeakSet, hilang saat koneksi ditutup)
+_dns_cache = {}  # (host, port) -> (expired_at, ip), hanya untuk client scraping
+_dns_lock = threading.Lock()
+
+def resolve_cached(host, port):
+    """Resolve host dengan cache TTL (DNS_CACHE_TTL adalah batas atas, TTL record asli tidak terbaca)"""
+    key = (host, port)
+    now = time.time()
+    with _dns_lock:
+        cached = _dns_cache.get(key)
+        if cached and cached[0] > now:
+            return cached[1]
+    ip = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)[0][4][0]
+    with _dns_lock:
+        _dns_cache[key] = (now + DNS_CACHE_TTL, ip)
+    return ip
+
+def create_cached_dns_backend():
+    """Network backend httpcore yang memakai resolve_cached, hanya dipasang di client scraping"""
+    import httpcore
+    
+    class CachedDNSBackend(httpcore.SyncBackend):
+        def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+            ip = resolve_cached(host, port)
+            try:
+                return super().connect_tcp(ip, port, timeout, local_address, socket_options)
+            except Exception:
+                # IP mungkin sudah tidak valid, resolve ulang di percobaan berikutnya
+                with _dns_lock:
+                    _dns_cache.pop((host, port), None)
+                raise
+    
+    return CachedDNSBackend()
+
+def get_accept_encoding():
+    """Hanya advertise encoding yang benar-benar bisa di-decode"""
+    encodings = ['gzip', 'deflate']
+    try:
+        import brotli  # noqa: F401
+        encodings.append('br')
+    except ImportError:
+        try:
+            import brotlicffi  # noqa: F401
+            encodings.append('br')
+        except ImportError:
+            logger.warning("⚠️ Brotli decoder not installed, not advertising 'br'")
+    return ', '.join(encodings)
+
+def get_http_client():
+    """Ambil (atau buat) client HTTP bersama yang dipakai semua fetch"""
+    global http_client
+    if http_client is None:
+        try:
+            import h2  # noqa: F401
+            use_http2 = True
+        except ImportError:
+            logger.warning("⚠️ h2 not installed, falling back to HTTP/1.1")
+            use_http2 = False
+        
+        transport = httpx.HTTPTransport(
+            http2=use_http2,
+            limits=httpx.Limits(
+                max_connections=HTTP_POOL_SIZE * 3,
+                max_keepalive_connections=HTTP_POOL_SIZE,
+                keepalive_expiry=HTTP_KEEPALIVE
+            )
+        )
+        
+        # httpx belum punya opsi publik untuk network backend, jadi dipasang ke pool transport ini saja
+        dns_cache_enabled = False
+        if DNS_CACHE_TTL > 0:
+            pool = getattr(transport, '_pool', None)
+            if pool is not None and hasattr(pool, '_network_backend'):
+                pool._network_backend = create_cached_dns_backend()
+                dns_cache_enabled = True
+            else:
+                logger.warning("⚠️ Cannot install DNS cache on this httpx version, resolving normally")
+        
+        http_client = httpx.Client(transport=transport, follow_redirects=True)
+        logger.info(f"🌐 HTTP client ready (HTTP/2: {use_http2}, pool: {HTTP_POOL_SIZE}, keep-alive: {HTTP_KEEPALIVE}s, "
+                    f"DNS cache: {str(DNS_CACHE_TTL) + 's' if dns_cache_enabled else 'off'})")
+    return http_client
+
+def close_http_client():
+    """Tutup client HTTP bersama"""
+    global http_client
+    if http_client is not None:
+        http_client.close()
+        http_client = None
+        logger.info("🌐 HTTP client closed")
+
+def record_http_stats(response, response_time):
+    """Catat pemakaian ulang socket, latency dan byte yang diterima per host"""
+    host = response.url.host
+    stats = http_stats.setdefault(host, {
+        'requests': 0, 'new_connections': 0, 'reused': 0, 'bytes': 0,
+        'total_time': 0.0, 'http_version': ''
+    })
+    stats['requests'] += 1
+    stats['bytes'] += response.num_bytes_downloaded
+    stats['total_time'] += response_time
+    stats['http_version'] = response.http_version
+    
+    stream = response.extensions.get('network_stream')
+    if stream is None:
+        return None
+    seen = _http_streams.setdefault(host, weakref.WeakSet())
+    if stream in seen:
+        stats['reused'] += 1
+        return True
+    seen.add(stream)
+    stats['new_connections'] += 1
+    return False
+
+def format_http_stats():
+    """Ringkasan statistik transport untuk /debug"""
+    if not http_stats:
+        return "   (belum ada request)\n"
+    lines = ""
+    for host, stats in list(http_stats.items()):
+        lines += (
+            f"   {host}: {stats['requests']} req, {stats['new_connections']} new conn, "
+            f"{stats['reused']} reused, avg {stats['total_time'] / stats['requests']:.2f}s, "
+            f"{stats['bytes'] / 1024:.1f} KB, {stats['http_version']}\n"
+        )
+    return lines
 
 def validate_url(url):
     """Validate URL format"""
@@ -124,9 +311,17 @@ def validate_url(url):
     except Exception:
         return False
 
-def get_news_from_multiple_sources():
-    """Ambil berita dari berbagai sumber dengan debugging detail"""
+def get_news_from_multiple_sources(fingerprints=None, model=None):
+    """Ambil berita dari berbagai sumber dengan debugging detail.
+    
+    Dijalankan di worker thread, jadi tidak mengubah state global: hasilnya
+    (berita relevan, berita yang dilewati, fingerprint halaman baru) dikembalikan
+    ke pemanggil. fingerprints=None berarti selalu scrape penuh.
+    """
+    from bs4 import BeautifulSoup
+    
     all_news = []
+    new_fingerprints = {}
     
     # Daftar sumber berita saham yang diperbarui
     sources = [
@@ -175,26 +370,43 @@ def get_news_from_multiple_sources():
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
         'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
         'Accept-Language': 'id,en;q=0.9,en-US;q=0.8',
-        'Accept-Encoding': 'gzip, deflate, br',
-        'Connection': 'keep-alive',
+        'Accept-Encoding': get_accept_encoding(),
         'Upgrade-Insecure-Requests': '1',
     }
     
+    client = get_http_client()
+    
     for source_idx, source in enumerate(sources):
         source_name = source["name"]
         logger.info(f"🔍 [{source_idx+1}/{len(sources)}] Scraping from {source_name}: {source['url']}")
         
         try:
+            # Conditional GET dengan validator dari siklus sebelumnya
+            request_headers = headers
+            fingerprint = fingerprints.get(source_name, {}) if fingerprints is not None else {}
+            if fingerprint.get('etag') or fingerprint.get('last_modified'):
+                request_headers = dict(headers)
+                if fingerprint.get('etag'):
+                    request_headers['If-None-Match'] = fingerprint['etag']
+                if fingerprint.get('last_modified'):
+                    request_headers['If-Modified-Since'] = fingerprint['last_modified']
+            
             start_time = time.time()
-            response = requests.get(
+            response = client.get(
                 source["url"], 
-                headers=headers, 
-                timeout=source["timeout"],
-                allow_redirects=True
+                headers=request_headers, 
+                timeout=source["timeout"]
             )
             response_time = time.time() - start_time
+            reused = record_http_stats(response, response_time)
+            connection_info = {True: 'reused conn', False: 'new conn', None: 'conn unknown'}[reused]
             
-            logger.info(f"   ⏱️ Response time: {response_time:.2f}s, Status: {response.status_code}")
+            logger.info(f"   ⏱️ Response time: {response_time:.2f}s, Status: {response.status_code}, "
+                        f"{response.http_version}, {connection_info}, {response.num_bytes_downloaded} bytes")
+            
+            if response.status_code == 304:
+                logger.info(f"   ♻️ {source_name} not modified since last cycle, skipping")
+                continue
             
             if response.status_code != 200:
                 logger.warning(f"   ⚠️ Failed to access {source_name}: HTTP {response.status_code}")
@@ -208,6 +420,16 @@ def get_news_from_multiple_sources():
                 logger.warning(f"   ⚠️ Non-HTML content from {source_name}: {content_type}")
                 continue
                 
+            content_hash = hashlib.md5(response.content).hexdigest()
+            if fingerprint.get('content_hash') == content_hash:
+                logger.info(f"   ♻️ {source_name} page unchanged since last cycle, skipping")
+                continue
+            new_fingerprints[source_name] = {
+                'etag': response.headers.get('etag'),
+                'last_modified': response.headers.get('last-modified'),
+                'content_hash': content_hash
+            }
+            
             soup = BeautifulSoup(response.content, 'html.parser')
             
             # Debug: log page title and meta
@@ -286,12 +508,6 @@ def get_news_from_multiple_sources():
                             logger.debug(f"   [{element_idx}] Invalid URL scheme: {full_url}")
                         continue
                     
-                    # Filter berita relevan
-                    if not is_relevant_news(title):
-                        if DEBUG_MODE:
-                            logger.debug(f"   [{element_idx}] Not relevant: '{title}'")
-                        continue
-                    
                     news_item = {
                         'title': title,
                         'link': full_url,
@@ -303,7 +519,6 @@ def get_news_from_multiple_sources():
                     
                     all_news.append(news_item)
                     processed_count += 1
-                    logger.info(f"   ✅ [{element_idx}] Added: {title[:60]}...")
                     
                 except Exception as e:
                     logger.error(f"   ❌ Error processing element {element_idx} in {source_name}: {str(e)}")
@@ -311,13 +526,15 @@ def get_news_from_multiple_sources():
                         logger.debug(f"   🔍 Element HTML: {str(element)[:200]}...")
                     continue
             
-            logger.info(f"   📊 {source_name}: {processed_count} valid news processed")
+            logger.info(f"   📊 {source_name}: {processed_count} candidate news processed")
                     
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             logger.error(f"   ❌ Timeout accessing {source_name} after {source['timeout']}s")
-        except requests.exceptions.ConnectionError:
+        except httpx.DecodingError as e:
+            logger.error(f"   ❌ Failed to decode response from {source_name}: {e}")
+        except httpx.ConnectError:
             logger.error(f"   ❌ Connection error accessing {source_name}")
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"   ❌ Request exception accessing {source_name}: {e}")
         except Exception as e:
             logger.error(f"   ❌ Unexpected error accessing {source_name}: {e}")
@@ -330,6 +547,9 @@ def get_news_from_multiple_sources():
             logger.info(f"   ⏳ Waiting {delay}s before next source...")
             time.sleep(delay)
     
+    # Filter berita relevan untuk semua kandidat sekaligus
+    all_news, skipped_news = filter_relevant_news(all_news, model)
+    
     # Hapus duplikat berdasarkan judul
     unique_news = []
     seen_titles = set()
@@ -342,46 +562,297 @@ def get_news_from_multiple_sources():
     
     logger.info(f"📊 FINAL: {len(all_news)} raw → {len(unique_news)} unique news")
     
-    # Simpan sebagai sample berita
-    if unique_news:
-        add_sample_news(unique_news)
-        logger.info(f"💾 Saved {len(unique_news)} news as samples")
-    
     # Log sample news for debugging
     if DEBUG_MODE and unique_news:
         logger.info("🔍 Sample unique news:")
         for i, item in enumerate(unique_news[:3]):
             logger.info(f"   {i+1}. {item['source']}: {item['title'][:80]}...")
     
-    return unique_news
+    return unique_news, skipped_news, new_fingerprints
+
+def load_relevance_model():
+    """Load model classifier relevansi jika tersedia; None berarti pakai filter kata kunci"""
+    try:
+        if os.path.exists(RELEVANCE_MODEL_FILE):
+            import news_classifier
+
+            model = news_classifier.load_model(RELEVANCE_MODEL_FILE)
+            if RELEVANCE_THRESHOLD:
+                model['threshold'] = float(RELEVANCE_THRESHOLD)
+            logger.info(f"🧠 Loaded relevance model (threshold {model['threshold']:.2f})")
+            return model
+        logger.info("🧠 No relevance model found, using keyword filter")
+    except ImportError:
+        logger.info("🧠 NumPy not available, using keyword filter")
+    except Exception as e:
+        logger.error(f"❌ Failed to load relevance model: {e}")
+    return None
+
+def archive_headlines(items, label):
+    """Simpan judul ke arsip training (1 = diposting, 0 = dilewati) beserta siapa yang memutuskan"""
+    global archived_titles
+    if archived_titles is None:
+        archived_titles = set()
+        try:
+            if os.path.exists(HEADLINE_ARCHIVE_FILE):
+                with open(HEADLINE_ARCHIVE_FILE, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue
+                        key = hashlib.md5(record['title'].strip().lower().encode()).hexdigest()
+                        archived_titles.add((key, record['label']))
+        except Exception as e:
+            logger.error(f"❌ Failed to load headline archive: {e}")
+    
+    try:
+        with open(HEADLINE_ARCHIVE_FILE, 'a', encoding='utf-8') as f:
+            for item in items:
+                key = (hashlib.md5(item['title'].strip().lower().encode()).hexdigest(), label)
+                if key in archived_titles:
+                    continue
+                archived_titles.add(key)
+                f.write(json.dumps({
+                    'title': item['title'],
+                    'source': item['source'],
+                    'label': label,
+                    'decided_by': item.get('relevance_by', 'keywords'),
+                    'timestamp': datetime.datetime.now().isoformat()
+                }, ensure_ascii=False) + '\n')
+    except Exception as e:
+        logger.error(f"❌ Failed to archive headlines: {e}")
+
+def filter_relevant_news(news_items, model=None):
+    """Pilih berita relevan; pakai classifier batch jika ada, fallback ke keyword.
+    
+    Return (relevan, dilewati).
+    """
+    candidates = [item for item in news_items if item['title'] and len(item['title']) >= 15]
+    if not candidates:
+        return [], []
+    
+    relevant = []
+    skipped = []
+    
+    if model is not None:
+        try:
+            import news_classifier
+            start_time = time.perf_counter()
+            scores = news_classifier.score_titles(model, [item['title'] for item in candidates])
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+            logger.info(f"🧠 Scored {len(candidates)} titles in {elapsed_ms:.2f}ms")
+            
+            for item, score in zip(candidates, scores):
+                item['relevance_score'] = round(float(score), 3)
+                item['relevance_by'] = 'model'
+                if score >= model['threshold']:
+                    relevant.append(item)
+                else:
+                    skipped.append(item)
+        except Exception as e:
+            logger.error(f"❌ Relevance model failed, using keyword filter: {e}")
+            relevant = []
+            skipped = []
+    
+    if not relevant and not skipped:
+        for item in candidates:
+            item['relevance_by'] = 'keywords'
+            if is_relevant_news(item['title']):
+                relevant.append(item)
+            else:
+                skipped.append(item)
+    
+    for item in relevant:
+        logger.info(f"   ✅ Added ({item['source']}): {item['title'][:60]}...")
+    if DEBUG_MODE:
+        for item in skipped:
+            logger.debug(f"   Not relevant ({item['source']}): '{item['title']}'")
+    
+    return relevant, skipped
+
+_term_token_re = re.compile(r"[a-z0-9]+")
+
+def normalize_term(term):
+    """Normalisasi kata kunci/ticker jadi token lowercase dipisah spasi"""
+    return ' '.join(_term_token_re.findall(term.lower()))
+
+def load_subscriptions():
+    """Load subscriptions from file dan bangun inverted index"""
+    global user_subscriptions
+    try:
+        if os.path.exists(SUBSCRIPTIONS_FILE):
+            with open(SUBSCRIPTIONS_FILE, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            user_subscriptions = {int(user_id): set(terms) for user_id, terms in data.items()}
+            logger.info(f"📁 Loaded {len(user_subscriptions)} subscribers from file")
+        else:
+            logger.info("📁 No subscriptions file found, starting fresh")
+            user_subscriptions = {}
+    except Exception as e:
+        logger.error(f"❌ Failed to load subscriptions: {e}")
+        user_subscriptions = {}
+    rebuild_subscription_index()
+
+def save_subscriptions():
+    """Save subscriptions to file"""
+    try:
+        with open(SUBSCRIPTIONS_FILE, 'w', encoding='utf-8') as f:
+            json.dump({str(user_id): sorted(terms) for user_id, terms in user_subscriptions.items()},
+                      f, indent=2, ensure_ascii=False)
+    except Exception as e:
+        logger.error(f"❌ Failed to save subscriptions: {e}")
 
-def is_relevant_news(title):
-    """Filter berita yang relevan dengan saham dan investasi"""
-    if not title or len(title) < 15:
+def rebuild_subscription_index():
+    """Bangun ulang inverted index term -> subscriber"""
+    global max_term_words
+    subscription_index.clear()
+    max_term_words = 1
+    for user_id, terms in user_subscriptions.items():
+        for term in terms:
+            subscription_index.setdefault(term, set()).add(user_id)
+            max_term_words = max(max_term_words, len(term.split()))
+
+def add_subscription(user_id, term):
+    """Tambah subscription; return False jika sudah ada"""
+    global max_term_words
+    terms = user_subscriptions.setdefault(user_id, set())
+    if term in terms:
+        return False
+    terms.add(term)
+    subscription_index.setdefault(term, set()).add(user_id)
+    max_term_words = max(max_term_words, len(term.split()))
+    return True
+
+def remove_subscription(user_id, term):
+    """Hapus subscription; return False jika tidak ada"""
+    terms = user_subscriptions.get(user_id)
+    if not terms or term not in terms:
         return False
+    terms.discard(term)
+    if not terms:
+        del user_subscriptions[user_id]
+    subscribers = subscription_index.get(term)
+    if subscribers:
+        subscribers.discard(user_id)
+        if not subscribers:
+            del subscription_index[term]
+    return True
+
+def remove_subscriber(user_id):
+    """Hapus semua subscription user (misalnya user memblokir bot)"""
+    for term in list(user_subscriptions.get(user_id, ())):
+        remove_subscription(user_id, term)
+
+def match_subscribers(title):
+    """Cari subscriber yang cocok dengan judul lewat lookup n-gram ke inverted index"""
+    if not subscription_index:
+        return set()
+    tokens = _term_token_re.findall(title.lower())
+    matched = set()
+    for n in range(1, max_term_words + 1):
+        for i in range(len(tokens) - n + 1):
+            subscribers = subscription_index.get(' '.join(tokens[i:i + n]))
+            if subscribers:
+                matched |= subscribers
+    return matched
+
+async def wait_for_send_slot():
+    """Tunggu giliran kirim; satu budget SEND_RATE_LIMIT dipakai bersama semua pengiriman bot"""
+    global send_next_slot
+    loop = asyncio.get_running_loop()
+    now = loop.time()
+    slot = max(now, send_next_slot)
+    send_next_slot = slot + (1.0 / SEND_RATE_LIMIT if SEND_RATE_LIMIT > 0 else 0)
+    if slot > now:
+        await asyncio.sleep(slot - now)
+
+def pause_sends(error):
+    """Tunda semua pengiriman berikutnya sesuai RetryAfter dari Telegram"""
+    global send_next_slot
+    retry_after = error.retry_after
+    if isinstance(retry_after, datetime.timedelta):
+        retry_after = retry_after.total_seconds()
+    logger.warning(f"   ⏳ Rate limited, pausing all sends for {retry_after}s")
+    send_next_slot = max(send_next_slot, asyncio.get_running_loop().time() + retry_after)
+
+async def deliver_subscriptions(bot, deliveries):
+    """Kirim DM ke subscriber lewat rate limiter bersama dengan concurrency terbatas"""
+    if not deliveries:
+        return
+    
+    semaphore = asyncio.Semaphore(DM_CONCURRENCY)
+    results = {'sent': 0, 'failed': 0, 'blocked': 0}
+    start_time = time.time()
+    
+    async def send_one(user_id, items):
+        message = "🔔 Berita sesuai langganan Anda\n\n"
+        for item in items[:10]:
+            message += f"📢 {item['title']}\n🔗 {item['link']}\n\n"
+        if len(message) > 4000:
+            message = message[:4000] + "\n\n... (truncated)"
         
-    title_lower = title.lower()
-    
-    keywords = [
-        'saham', 'bursa', 'idx', 'emiten', 'dividen', 'laba', 'rugi',
-        'right issue', 'ipo', 'obligasi', 'reksadana', 'investasi',
-        'sekuritas', 'trading', 'portofolio', 'korporasi', 'financial',
-        'keuangan', 'profit', 'ekspansi', 'rupiah', 'dolar', 'ekonomi',
-        'bni', 'bca', 'bbri', 'bbca', 'bmri', 'tlkm', 'asii', 'antm',
-        'bbni', 'itmg', 'adro', 'mdka', 'inkp', 'jsmr', 'tpia', 'wika',
-        'smgr', 'insi', 'icbp', 'unvr', 'myor', 'ultj'
-    ]
+        async with semaphore:
+            for attempt in range(2):
+                await wait_for_send_slot()
+                try:
+                    await bot.send_message(chat_id=user_id, text=message, disable_web_page_preview=True)
+                    results['sent'] += 1
+                    return
+                except RetryAfter as e:
+                    pause_sends(e)
+                except Forbidden:
+                    logger.info(f"   🚫 User {user_id} blocked the bot, removing subscriptions")
+                    remove_subscriber(user_id)
+                    results['blocked'] += 1
+                    return
+                except Exception as e:
+                    logger.error(f"   ❌ Failed to send DM to {user_id}: {e}")
+                    break
+            results['failed'] += 1
     
-    # Tambahkan kata kunci sektor tertentu
-    sector_keywords = [
-        'bank', 'tambang', 'minyak', 'gas', 'property', 'real estate',
-        'konstruksi', 'infrastruktur', 'technology', 'telekomunikasi',
-        'konsumsi', 'retail', 'farmasi', 'kesehatan', 'otomotif'
-    ]
+    await asyncio.gather(*(send_one(user_id, items) for user_id, items in deliveries.items()))
     
-    all_keywords = keywords + sector_keywords
+    if results['blocked']:
+        save_subscriptions()
     
-    return any(keyword in title_lower for keyword in all_keywords)
+    logger.info(f"🔔 DM fan-out: {results['sent']} sent, {results['failed']} failed, "
+                f"{results['blocked']} blocked in {time.time() - start_time:.1f}s")
+
+async def scrape_news(use_fingerprints=True):
+    """Scrape di worker thread, lalu terapkan hasilnya ke state di event loop.
+    
+    Return (berita, fingerprint baru). Fingerprint baru belum disimpan; send_news
+    yang menyimpannya setelah semua berita terkirim atau sudah pernah dikirim.
+    """
+    global relevance_model, relevance_model_loaded
+    async with scrape_lock:
+        if not relevance_model_loaded:
+            relevance_model = await asyncio.to_thread(load_relevance_model)
+            relevance_model_loaded = True
+        
+        fingerprints = dict(page_fingerprints) if use_fingerprints else None
+        news_items, skipped_news, new_fingerprints = await asyncio.to_thread(
+            get_news_from_multiple_sources, fingerprints, relevance_model
+        )
+    
+    # Judul yang ditolak model tidak diarsipkan supaya retraining tidak memperkuat output model sendiri
+    archive_headlines([item for item in skipped_news if item['relevance_by'] == 'keywords'], 0)
+    
+    # Simpan sebagai sample berita
+    if news_items:
+        add_sample_news(news_items)
+        logger.info(f"💾 Saved {len(news_items)} news as samples")
+    
+    return news_items, new_fingerprints
+
+async def fetch_news():
+    """Ambil hasil scrape pertama (jika sudah dimulai saat startup) atau scrape baru"""
+    global prefetch_task
+    task, prefetch_task = prefetch_task, None
+    if task is not None:
+        return await task
+    return await scrape_news()
 
 async def send_news(context: ContextTypes.DEFAULT_TYPE):
     """Kirim berita baru ke Telegram dengan error handling yang lebih baik"""
@@ -389,14 +860,20 @@ async def send_news(context: ContextTypes.DEFAULT_TYPE):
     logger.info(f"🔄 [{job_name}] Starting news check...")
     
     try:
-        news_items = get_news_from_multiple_sources()
+        news_items, new_fingerprints = await fetch_news()
+        
+        scheduler_state['last_cycle_at'] = datetime.datetime.now().isoformat()
+        scheduler_state['cycle_count'] += 1
         
         if not news_items:
             logger.info(f"📭 [{job_name}] No news items found")
+            page_fingerprints.update(new_fingerprints)
+            save_state_snapshot()
             return
             
         sent_count = 0
         error_count = 0
+        deliveries = {}  # user_id -> list berita yang cocok
         
         for item_idx, item in enumerate(news_items):
             try:
@@ -417,6 +894,7 @@ async def send_news(context: ContextTypes.DEFAULT_TYPE):
                 )
                 
                 # Kirim pesan
+                await wait_for_send_slot()
                 await context.bot.send_message(
                     chat_id=CHANNEL_ID,
                     text=message,
@@ -424,8 +902,12 @@ async def send_news(context: ContextTypes.DEFAULT_TYPE):
                     disable_web_page_preview=False
                 )
                 
-                sent_news_titles.add(title_hash)
+                sent_news_titles[title_hash] = None
                 sent_count += 1
+                save_state_snapshot()  # Simpan langsung supaya restart tidak mengirim ulang
+                archive_headlines([item], 1)
+                for user_id in match_subscribers(item['title']):
+                    deliveries.setdefault(user_id, []).append(item)
                 
                 logger.info(f"   ✅ [{item_idx}] Sent: {item['title'][:60]}...")
                 
@@ -437,6 +919,8 @@ async def send_news(context: ContextTypes.DEFAULT_TYPE):
             except Exception as e:
                 error_count += 1
                 logger.error(f"   ❌ [{item_idx}] Failed to send news: {str(e)}")
+                if isinstance(e, RetryAfter):
+                    pause_sends(e)
                 if "Message is too long" in str(e):
                     logger.error(f"   📝 Message too long, trimming...")
                     # Coba kirim versi yang lebih pendek
@@ -446,31 +930,46 @@ async def send_news(context: ContextTypes.DEFAULT_TYPE):
                             f"🔗 {item['link']}\n\n"
                             f"#{item['source'].replace(' ', '')} #BeritaSaham"
                         )
+                        await wait_for_send_slot()
                         await context.bot.send_message(
                             chat_id=CHANNEL_ID,
                             text=short_message,
                             parse_mode='Markdown'
                         )
-                        sent_news_titles.add(title_hash)
+                        sent_news_titles[title_hash] = None
                         sent_count += 1
+                        save_state_snapshot()
+                        archive_headlines([item], 1)
+                        for user_id in match_subscribers(item['title']):
+                            deliveries.setdefault(user_id, []).append(item)
                         logger.info(f"   ✅ [{item_idx}] Sent trimmed version")
                     except Exception as e2:
                         logger.error(f"   ❌ [{item_idx}] Also failed to send trimmed version: {e2}")
         
         logger.info(f"📨 [{job_name}] Completed: {sent_count} sent, {error_count} errors")
         
-        # Simpan ke file
-        if sent_count > 0:
-            save_sent_news()
+        # Fan-out ke subscriber berjalan di background supaya siklus berikutnya tidak tertahan
+        if deliveries:
+            logger.info(f"🔔 [{job_name}] Dispatching DMs to {len(deliveries)} subscribers")
+            context.application.create_task(
+                deliver_subscriptions(context.bot, deliveries),
+                name=f"dm_fanout_{job_name}"
+            )
+        
+        # Fingerprint baru hanya disimpan jika semua berita sudah terkirim,
+        # supaya berita yang gagal di-scrape ulang siklus berikutnya
+        if error_count == 0:
+            page_fingerprints.update(new_fingerprints)
         
         # Cleanup memory
         if len(sent_news_titles) > 500:
             # Simpan hanya 300 terbaru
             temp_list = list(sent_news_titles)[-300:]
             sent_news_titles.clear()
-            sent_news_titles.update(temp_list)
-            save_sent_news()
+            sent_news_titles.update(dict.fromkeys(temp_list))
             logger.info("🧹 Memory cache cleaned (kept 300 most recent)")
+        
+        save_state_snapshot()
             
     except Exception as e:
         logger.error(f"❌ [{job_name}] Critical error in send_news: {e}")
@@ -492,7 +991,10 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "• /test - Test berita\n"
         "• /clear - Reset cache\n"
         "• /debug - Debug info\n"
-        "• /sample - Lihat sample berita\n\n"
+        "• /sample - Lihat sample berita\n"
+        "• /subscribe BBRI - Langganan ticker/kata kunci via DM\n"
+        "• /unsubscribe BBRI - Berhenti langganan\n"
+        "• /subscriptions - Lihat langganan\n\n"
         "🔧 Deployed di Railway"
     )
 
@@ -508,13 +1010,14 @@ async def status(update: Update, context: ContextTypes.DEFAULT_TYPE):
         f"📊 **Status Bot**\n\n"
         f"• Berita dikirim: {len(sent_news_titles)}\n"
         f"• Sample berita: {len(sample_news_items)}\n"
+        f"• Subscriber: {len(user_subscriptions)} ({len(subscription_index)} term)\n"
         f"• Jobs aktif: {job_count}\n"
+        f"• Siklus sejak deploy: {scheduler_state['cycle_count']}\n"
         f"• Interval: {CHECK_INTERVAL} detik\n"
         f"• Debug mode: {'✅ ON' if DEBUG_MODE else '❌ OFF'}\n"
         f"• Terakhir dicek: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
         f"• Status: ✅ AKTIF\n\n"
-        f"💾 Cache file: {'✅ Ada' if os.path.exists(SENT_NEWS_FILE) else '❌ Tidak ada'}\n"
-        f"💾 Sample file: {'✅ Ada' if os.path.exists(SAMPLE_NEWS_FILE) else '❌ Tidak ada'}"
+        f"💾 Snapshot file: {'✅ Ada' if os.path.exists(STATE_SNAPSHOT_FILE) else '❌ Tidak ada'}"
     )
 
 async def clear_cache(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -524,10 +1027,12 @@ async def clear_cache(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     old_count = len(sent_news_titles)
     sent_news_titles.clear()
+    page_fingerprints.clear()
     
-    # Hapus file cache juga
+    # Hapus file cache lama dan perbarui snapshot
     if os.path.exists(SENT_NEWS_FILE):
         os.remove(SENT_NEWS_FILE)
+    save_state_snapshot()
     
     await update.message.reply_text(f"✅ Cache berhasil dibersihkan! ({old_count} entri dihapus)")
 
@@ -539,7 +1044,7 @@ async def test_news(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text("🔍 Testing pencarian berita...")
     
     try:
-        news_items = get_news_from_multiple_sources()
+        news_items, _ = await scrape_news(use_fingerprints=False)
         
         if news_items:
             message = f"✅ Ditemukan {len(news_items)} berita:\n\n"
@@ -574,8 +1079,11 @@ async def debug_info(update: Update, context: ContextTypes.DEFAULT_TYPE):
         f"• Check interval: {CHECK_INTERVAL}s\n"
         f"• Debug mode: {DEBUG_MODE}\n"
         f"• Current time: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
-        f"• Cache file: {SENT_NEWS_FILE} ({os.path.getsize(SENT_NEWS_FILE) if os.path.exists(SENT_NEWS_FILE) else 0} bytes)\n"
-        f"• Sample file: {SAMPLE_NEWS_FILE} ({os.path.getsize(SAMPLE_NEWS_FILE) if os.path.exists(SAMPLE_NEWS_FILE) else 0} bytes)\n"
+        f"• Snapshot file: {STATE_SNAPSHOT_FILE} ({os.path.getsize(STATE_SNAPSHOT_FILE) if os.path.exists(STATE_SNAPSHOT_FILE) else 0} bytes)\n"
+        f"• Last cycle: {scheduler_state['last_cycle_at'] or '-'} (#{scheduler_state['cycle_count']})\n"
+        f"• Relevance filter: {'model (threshold ' + format(relevance_model['threshold'], '.2f') + ')' if relevance_model else 'keywords'}\n"
+        f"• HTTP pool: {HTTP_POOL_SIZE} keep-alive, DNS cache: {len(_dns_cache) if DNS_CACHE_TTL > 0 else 'off'}\n"
+        f"{format_http_stats()}"
     )
     
     await update.message.reply_text(debug_info)
@@ -655,12 +1163,119 @@ async def clear_samples(update: Update, context: ContextTypes.DEFAULT_TYPE):
     old_count = len(sample_news_items)
     sample_news_items.clear()
     
-    # Hapus file sample juga
+    # Hapus file sample lama dan perbarui snapshot
     if os.path.exists(SAMPLE_NEWS_FILE):
         os.remove(SAMPLE_NEWS_FILE)
+    save_state_snapshot()
     
     await update.message.reply_text(f"✅ Sample berita berhasil dibersihkan! ({old_count} sample dihapus)")
 
+async def label_headline(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handler /label - Admin memberi label manual (relevan/noise) untuk training classifier"""
+    user = update.effective_user
+    logger.info(f"👤 User {user.id} used /label")
+    
+    if user.id not in ADMIN_IDS:
+        await update.message.reply_text("⛔ Perintah ini hanya untuk admin")
+        return
+    
+    args = context.args or []
+    labels = {'relevan': 1, 'noise': 0}
+    if len(args) < 2 or args[0].lower() not in labels:
+        await update.message.reply_text(
+            "❓ Contoh:\n"
+            "/label noise Rupiah melemah tipis sore ini\n"
+            "/label relevan BBRI bagikan dividen interim"
+        )
+        return
+    
+    title = ' '.join(args[1:]).strip()
+    label = labels[args[0].lower()]
+    try:
+        with open(HEADLINE_LABELS_FILE, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({
+                'title': title,
+                'label': label,
+                'labeled_by': user.id,
+                'timestamp': datetime.datetime.now().isoformat()
+            }, ensure_ascii=False) + '\n')
+    except Exception as e:
+        logger.error(f"❌ Failed to save label: {e}")
+        await update.message.reply_text("❌ Gagal menyimpan label")
+        return
+    
+    await update.message.reply_text(f"✅ Label '{args[0].lower()}' disimpan: {title[:80]}")
+
+def parse_terms(args):
+    """Ambil daftar term dari argumen; pakai koma untuk frasa (mis. 'right issue, dividen')"""
+    text = ' '.join(args)
+    parts = text.split(',') if ',' in text else args
+    terms = []
+    for part in parts:
+        term = normalize_term(part)
+        if 2 <= len(term) <= 40 and term not in terms:
+            terms.append(term)
+    return terms
+
+async def subscribe(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handler /subscribe - Langganan berita berdasarkan ticker/kata kunci"""
+    user = update.effective_user
+    logger.info(f"👤 User {user.id} used /subscribe {context.args}")
+    
+    terms = parse_terms(context.args or [])
+    if not terms:
+        await update.message.reply_text(
+            "❓ Contoh: /subscribe BBRI TLKM\n"
+            "Gunakan koma untuk frasa: /subscribe right issue, dividen"
+        )
+        return
+    
+    current = len(user_subscriptions.get(user.id, ()))
+    added = []
+    for term in terms:
+        if current + len(added) >= MAX_SUBSCRIPTIONS:
+            break
+        if add_subscription(user.id, term):
+            added.append(term)
+    save_subscriptions()
+    
+    message = f"✅ Berlangganan: {', '.join(added)}" if added else "ℹ️ Tidak ada langganan baru"
+    if len(user_subscriptions.get(user.id, ())) >= MAX_SUBSCRIPTIONS:
+        message += f"\n⚠️ Maksimal {MAX_SUBSCRIPTIONS} langganan per user"
+    await update.message.reply_text(message)
+
+async def unsubscribe(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handler /unsubscribe - Berhenti langganan (tanpa argumen = semua)"""
+    user = update.effective_user
+    logger.info(f"👤 User {user.id} used /unsubscribe {context.args}")
+    
+    if not context.args:
+        old_count = len(user_subscriptions.get(user.id, ()))
+        remove_subscriber(user.id)
+        save_subscriptions()
+        await update.message.reply_text(f"✅ Semua langganan dihapus ({old_count} term)")
+        return
+    
+    removed = [term for term in parse_terms(context.args) if remove_subscription(user.id, term)]
+    save_subscriptions()
+    
+    if removed:
+        await update.message.reply_text(f"✅ Berhenti langganan: {', '.join(removed)}")
+    else:
+        await update.message.reply_text("ℹ️ Term tersebut tidak ada di langganan Anda")
+
+async def list_subscriptions(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handler /subscriptions - Tampilkan langganan user"""
+    user = update.effective_user
+    logger.info(f"👤 User {user.id} used /subscriptions")
+    
+    terms = sorted(user_subscriptions.get(user.id, ()))
+    if not terms:
+        await update.message.reply_text("📭 Belum ada langganan. Contoh: /subscribe BBRI")
+        return
+    
+    await update.message.reply_text(f"🔔 Langganan Anda ({len(terms)}):\n" + '\n'.join(f"• {term}" for term in terms))
+
 async def error_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Global error handler dengan detail lebih"""
     error_msg = f"Update {update} caused error {context.error}"
@@ -678,18 +1293,24 @@ async def error_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         except Exception:
             pass
 
+async def post_init(application: Application):
+    """Mulai scrape pertama bersamaan dengan setup polling"""
+    global prefetch_task
+    prefetch_task = asyncio.create_task(scrape_news())
+    logger.info("⚡ First scrape cycle started in background")
+
 def main():
     """Main function dengan error handling yang lebih baik"""
     try:
         logger.info("🚀 Starting Enhanced News Bot with Sample Feature...")
-        logger.info("📦 Loading sent news cache...")
+        logger.info("📦 Restoring state snapshot...")
         
-        # Load cache yang tersimpan
-        load_sent_news()
-        load_sample_news()
+        # Load state yang tersimpan (model relevansi di-load saat dibutuhkan)
+        load_state_snapshot()
+        load_subscriptions()
         
         # Buat application
-        application = Application.builder().token(BOT_TOKEN).build()
+        application = Application.builder().token(BOT_TOKEN).post_init(post_init).build()
         
         # Add handlers
         application.add_handler(CommandHandler("start", start))
@@ -699,6 +1320,10 @@ def main():
         application.add_handler(CommandHandler("debug", debug_info))
         application.add_handler(CommandHandler("sample", sample_news))
         application.add_handler(CommandHandler("clearsamples", clear_samples))
+        application.add_handler(CommandHandler("subscribe", subscribe))
+        application.add_handler(CommandHandler("unsubscribe", unsubscribe))
+        application.add_handler(CommandHandler("subscriptions", list_subscriptions))
+        application.add_handler(CommandHandler("label", label_headline))
         
         # Setup error handler
         application.add_error_handler(error_handler)
@@ -708,7 +1333,7 @@ def main():
             job = application.job_queue.run_repeating(
                 send_news, 
                 interval=CHECK_INTERVAL, 
-                first=10,
+                first=0,
                 name="news_checker"
             )
             logger.info(f"✅ Scheduled job '{job.name}' dengan interval {CHECK_INTERVAL}s")
@@ -726,14 +1351,13 @@ def main():
         
     except KeyboardInterrupt:
         logger.info("⏹️ Bot stopped by user (Ctrl+C)")
-        save_sent_news()  # Simpan sebelum exit
-        save_sample_news()  # Simpan sample sebelum exit
     except Exception as e:
         logger.error(f"❌ Failed to start bot: {e}")
         logger.error(f"🔍 Traceback: {traceback.format_exc()}")
-        save_sent_news()  # Coba simpan sebelum exit
-        save_sample_news()  # Coba simpan sample sebelum exit
         exit(1)
+    finally:
+        save_state_snapshot()  # Simpan sebelum exit (termasuk SIGTERM saat restart)
+        close_http_client()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
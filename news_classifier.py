@@ -0,0 +1,211 @@
+"""
+Classifier relevansi berita saham (hashed n-gram + logistic regression, NumPy saja).
+
+Dipakai oleh bot untuk menilai semua judul kandidat satu siklus sekaligus.
+Training dilakukan offline dari arsip judul yang diposting vs yang dilewati
+filter kata kunci (label lemah), ditambah label manual dari admin (/label)
+yang menjadi acuan evaluasi:
+
+    python news_classifier.py headline_archive.jsonl relevance_model.npz headline_labels.jsonl
+"""
+import json
+import re
+import sys
+import time
+import zlib
+
+import numpy as np
+
+from relevance_keywords import is_relevant_news
+
+DEFAULT_DIM = 2 ** 18
+DEFAULT_THRESHOLD = 0.5
+MANUAL_LABEL_WEIGHT = 5.0  # Label manual lebih dipercaya daripada label lemah dari filter kata kunci
+MIN_MANUAL_HOLDOUT = 20  # Minimal label manual supaya evaluasi tidak memakai label lemah
+
+_token_re = re.compile(r"[a-z0-9]+")
+
+def extract_features(title):
+    """Ubah judul jadi daftar fitur (unigram, bigram kata, dan char 4-gram)"""
+    tokens = _token_re.findall(title.lower())
+    features = ['w:' + tok for tok in tokens]
+    features += ['b:' + a + '_' + b for a, b in zip(tokens, tokens[1:])]
+    for tok in tokens:
+        padded = '^' + tok + '$'
+        if len(padded) > 4:
+            features += ['c:' + padded[i:i + 4] for i in range(len(padded) - 3)]
+    return features
+
+def featurize_batch(titles, dim=DEFAULT_DIM):
+    """Hash fitur semua judul ke format sparse (row, col, value) dengan normalisasi L2"""
+    rows = []
+    cols = []
+    for row, title in enumerate(titles):
+        for feature in extract_features(title):
+            rows.append(row)
+            cols.append(zlib.crc32(feature.encode('utf-8')) % dim)
+
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    counts = np.bincount(rows, minlength=len(titles)).astype(np.float64)
+    norms = np.sqrt(np.maximum(counts, 1.0))
+    vals = 1.0 / norms[rows] if len(rows) else np.zeros(0)
+    return rows, cols, vals
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-np.clip(x, -30, 30)))
+
+def score_titles(model, titles):
+    """Hitung probabilitas relevan untuk semua judul dalam satu operasi batch"""
+    if not titles:
+        return np.zeros(0)
+    rows, cols, vals = featurize_batch(titles, model['dim'])
+    logits = np.bincount(rows, weights=model['weights'][cols] * vals, minlength=len(titles))
+    return _sigmoid(logits + model['bias'])
+
+def train_model(titles, labels, weights_per_title=None, dim=DEFAULT_DIM, epochs=200, learning_rate=2.0, l2=1e-4):
+    """Latih logistic regression full-batch gradient descent di atas fitur hashed"""
+    labels = np.asarray(labels, dtype=np.float64)
+    rows, cols, vals = featurize_batch(titles, dim)
+    n = len(titles)
+    weights = np.zeros(dim)
+
+    # Seimbangkan kelas supaya berita positif yang sedikit tetap berbobot
+    pos = max(labels.sum(), 1.0)
+    neg = max(n - labels.sum(), 1.0)
+    sample_weight = np.where(labels == 1, n / (2 * pos), n / (2 * neg))
+    if weights_per_title is not None:
+        sample_weight = sample_weight * np.asarray(weights_per_title, dtype=np.float64)
+    bias = 0.0
+
+    for _ in range(epochs):
+        logits = np.bincount(rows, weights=weights[cols] * vals, minlength=n) + bias
+        error = (_sigmoid(logits) - labels) * sample_weight / n
+        grad = np.bincount(cols, weights=error[rows] * vals, minlength=dim) + l2 * weights
+        weights -= learning_rate * grad
+        bias -= learning_rate * error.sum()
+
+    return {'weights': weights, 'bias': float(bias), 'dim': dim, 'threshold': DEFAULT_THRESHOLD}
+
+def save_model(model, path):
+    """Simpan model ke file .npz"""
+    np.savez_compressed(
+        path,
+        weights=model['weights'].astype(np.float32),
+        bias=np.float64(model['bias']),
+        dim=np.int64(model['dim']),
+        threshold=np.float64(model['threshold'])
+    )
+
+def load_model(path):
+    """Load model dari file .npz"""
+    with np.load(path) as data:
+        return {
+            'weights': data['weights'].astype(np.float64),
+            'bias': float(data['bias']),
+            'dim': int(data['dim']),
+            'threshold': float(data['threshold'])
+        }
+
+def _read_jsonl(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+def load_archive(path):
+    """Baca arsip judul (label lemah); 'posted' menang atas 'skipped'.
+
+    Keputusan yang dibuat model sendiri diabaikan supaya retraining tidak
+    memperkuat output model.
+    """
+    labels = {}
+    for record in _read_jsonl(path):
+        if record.get('decided_by', 'keywords') != 'keywords':
+            continue
+        key = record['title'].strip().lower()
+        labels[key] = max(labels.get(key, 0), int(record['label']))
+    return labels
+
+def load_manual_labels(path):
+    """Baca label manual dari admin; label terakhir untuk judul yang sama menang"""
+    labels = {}
+    for record in _read_jsonl(path):
+        labels[record['title'].strip().lower()] = int(record['label'])
+    return labels
+
+def precision_recall(predicted, labels):
+    """Hitung precision/recall dari prediksi boolean"""
+    predicted = np.asarray(predicted, dtype=bool)
+    labels = np.asarray(labels)
+    tp = int(np.sum(predicted & (labels == 1)))
+    fp = int(np.sum(predicted & (labels == 0)))
+    fn = int(np.sum(~predicted & (labels == 1)))
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    return precision, recall
+
+def build_training_set(weak_labels, manual_labels, exclude=()):
+    """Gabungkan label lemah dan manual (manual menang dan diberi bobot lebih)"""
+    combined = dict(weak_labels)
+    combined.update(manual_labels)
+    titles = [title for title in combined if title not in exclude]
+    labels = [combined[title] for title in titles]
+    weights = [MANUAL_LABEL_WEIGHT if title in manual_labels else 1.0 for title in titles]
+    return titles, labels, weights
+
+def main(argv):
+    if len(argv) < 3:
+        print("Usage: python news_classifier.py <headline_archive.jsonl> <relevance_model.npz> [headline_labels.jsonl]")
+        return 1
+
+    archive_path, model_path = argv[1], argv[2]
+    weak_labels = load_archive(archive_path)
+    manual_labels = load_manual_labels(argv[3]) if len(argv) > 3 else {}
+    titles, labels, weights = build_training_set(weak_labels, manual_labels)
+    positives = sum(labels)
+    print(f"📁 Loaded {len(weak_labels)} archived + {len(manual_labels)} manually labeled headlines "
+          f"({positives} relevant, {len(titles) - positives} noise)")
+    if not positives or positives == len(titles):
+        print("❌ Training data needs both relevant and noise headlines")
+        return 1
+
+    # Holdout 20% untuk evaluasi. Label lemah hanya menyalin filter kata kunci,
+    # jadi perbandingan yang jujur hanya mungkin di atas label manual.
+    rng = np.random.default_rng(42)
+    if len(manual_labels) >= MIN_MANUAL_HOLDOUT:
+        holdout_pool = sorted(manual_labels)
+        holdout_name = "manual labels"
+    else:
+        holdout_pool = sorted(titles)
+        holdout_name = "archive labels"
+        print(f"⚠️ Only {len(manual_labels)} manual labels (need {MIN_MANUAL_HOLDOUT}); "
+              "holdout uses keyword-derived labels, so the comparison below is not meaningful")
+    order = rng.permutation(len(holdout_pool))
+    test_titles = [holdout_pool[i] for i in order[:max(1, len(holdout_pool) // 5)]]
+    test_labels = [manual_labels.get(title, weak_labels.get(title)) for title in test_titles]
+
+    train_titles, train_labels, train_weights = build_training_set(weak_labels, manual_labels, set(test_titles))
+    model = train_model(train_titles, train_labels, train_weights)
+    model_pr = precision_recall(score_titles(model, test_titles) >= model['threshold'], test_labels)
+    keyword_pr = precision_recall([is_relevant_news(title) for title in test_titles], test_labels)
+    print(f"📊 Holdout ({len(test_titles)} {holdout_name}):")
+    print(f"   model:    precision {model_pr[0]:.3f}, recall {model_pr[1]:.3f}")
+    print(f"   keywords: precision {keyword_pr[0]:.3f}, recall {keyword_pr[1]:.3f}")
+
+    model = train_model(titles, labels, weights)
+    save_model(model, model_path)
+
+    start_time = time.perf_counter()
+    score_titles(model, titles)
+    per_title = (time.perf_counter() - start_time) / len(titles) * 1000
+    print(f"💾 Saved model to {model_path} (scoring {per_title:.4f} ms/title)")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
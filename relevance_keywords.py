@@ -0,0 +1,34 @@
+"""
+Filter relevansi berbasis kata kunci.
+
+Dipakai bot sebagai fallback jika model classifier tidak tersedia, dan oleh
+news_classifier.py sebagai pembanding saat evaluasi model.
+"""
+
+def is_relevant_news(title):
+    """Filter berita yang relevan dengan saham dan investasi"""
+    if not title or len(title) < 15:
+        return False
+        
+    title_lower = title.lower()
+    
+    keywords = [
+        'saham', 'bursa', 'idx', 'emiten', 'dividen', 'laba', 'rugi',
+        'right issue', 'ipo', 'obligasi', 'reksadana', 'investasi',
+        'sekuritas', 'trading', 'portofolio', 'korporasi', 'financial',
+        'keuangan', 'profit', 'ekspansi', 'rupiah', 'dolar', 'ekonomi',
+        'bni', 'bca', 'bbri', 'bbca', 'bmri', 'tlkm', 'asii', 'antm',
+        'bbni', 'itmg', 'adro', 'mdka', 'inkp', 'jsmr', 'tpia', 'wika',
+        'smgr', 'insi', 'icbp', 'unvr', 'myor', 'ultj'
+    ]
+    
+    # Tambahkan kata kunci sektor tertentu
+    sector_keywords = [
+        'bank', 'tambang', 'minyak', 'gas', 'property', 'real estate',
+        'konstruksi', 'infrastruktur', 'technology', 'telekomunikasi',
+        'konsumsi', 'retail', 'farmasi', 'kesehatan', 'otomotif'
+    ]
+    
+    all_keywords = keywords + sector_keywords
+    
+    return any(keyword in title_lower for keyword in all_keywords)